@@ -4,6 +4,7 @@ from typing import Dict, List, Optional
 from openai import OpenAI
 
 from biz.llm.client.base import BaseClient
+from biz.llm.http_client import get_http_client
 from biz.llm.types import NotGiven, NOT_GIVEN
 from biz.utils.log import logger
 
@@ -15,7 +16,8 @@ class DeepSeekClient(BaseClient):
         if not self.api_key:
             raise ValueError("API key is required. Please provide it or set it in the environment variables.")
 
-        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url) # DeepSeek supports OpenAI API SDK
+        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url,
+                             http_client=get_http_client()) # DeepSeek supports OpenAI API SDK
         self.default_model = os.getenv("DEEPSEEK_API_MODEL", "deepseek-chat")
 
     def completions(self,
@@ -4,6 +4,7 @@ from typing import Dict, List, Optional
 from openai import OpenAI
 
 from biz.llm.client.base import BaseClient
+from biz.llm.http_client import get_http_client
 from biz.llm.types import NotGiven, NOT_GIVEN
 
 
@@ -14,7 +15,8 @@ class OpenAIClient(BaseClient):
         if not self.api_key:
             raise ValueError("API key is required. Please provide it or set it in the environment variables.")
 
-        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url,
+                             http_client=get_http_client())
         self.default_model = os.getenv("OPENAI_API_MODEL", "gpt-4o-mini")
 
     def completions(self,
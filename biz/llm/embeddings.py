@@ -1,8 +1,19 @@
+import hashlib
 import os
+from functools import lru_cache
 from typing import List, Optional
 
+from diskcache import Cache
 from openai import OpenAI
 
+from biz.llm.http_client import get_http_client
+
+
+@lru_cache(maxsize=None)
+def _get_cache(directory: str) -> Cache:
+    """同一目录的磁盘缓存在进程内复用，按最近使用淘汰"""
+    return Cache(directory, eviction_policy="least-recently-used")
+
 
 class EmbeddingProvider:
     """
@@ -11,6 +22,8 @@ class EmbeddingProvider:
       - OPENAI_API_KEY
       - OPENAI_API_BASE_URL（可选，默认 https://api.openai.com）
       - EMBEDDING_MODEL（可选，默认 text-embedding-3-small）
+      - EMBEDDING_BATCH_SIZE（可选，单次请求的最大条数，默认 96）
+      - EMBEDDING_CACHE_DIR（可选，磁盘缓存目录，默认 data/embedding_cache）
     """
     def __init__(self,
                  api_key: Optional[str] = None,
@@ -21,14 +34,32 @@ class EmbeddingProvider:
             raise ValueError("缺少 OPENAI_API_KEY，无法使用向量检索。")
         self.base_url = base_url or os.getenv("OPENAI_API_BASE_URL", "https://api.openai.com")
         self.model = model or os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
-        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+        self.batch_size = max(1, int(os.getenv("EMBEDDING_BATCH_SIZE", 96)))
+        self.cache = _get_cache(os.getenv("EMBEDDING_CACHE_DIR", "data/embedding_cache"))
+        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url,
+                             http_client=get_http_client())
+
+    def _cache_key(self, text: str) -> tuple:
+        return self.model, hashlib.sha1(text.encode("utf-8")).hexdigest()
 
     def get_embeddings(self, texts: List[str]) -> List[List[float]]:
         if not texts:
             return []
-        res = self.client.embeddings.create(
-            model=self.model,
-            input=texts
-        )
-        # OpenAI SDK 返回与 input 顺序一致
-        return [d.embedding for d in res.data]
\ No newline at end of file
+        keys = [self._cache_key(t) for t in texts]
+        results: List[Optional[List[float]]] = [self.cache.get(k) for k in keys]
+
+        # 仅对未命中缓存的文本（去重后）分批请求
+        misses = list(dict.fromkeys(t for t, r in zip(texts, results) if r is None))
+        fetched = {}
+        for start in range(0, len(misses), self.batch_size):
+            chunk = misses[start:start + self.batch_size]
+            res = self.client.embeddings.create(
+                model=self.model,
+                input=chunk
+            )
+            # OpenAI SDK 返回与 input 顺序一致
+            for text, d in zip(chunk, res.data):
+                fetched[text] = d.embedding
+                self.cache.set(self._cache_key(text), d.embedding)
+
+        return [r if r is not None else fetched[t] for t, r in zip(texts, results)]
@@ -0,0 +1,27 @@
+import os
+import threading
+from typing import Optional
+
+import httpx
+
+_client: Optional[httpx.Client] = None
+_client_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    进程内共享的 HTTP/2 连接池，供基于 OpenAI SDK 的客户端（Embedding、DeepSeek、OpenAI、Qwen）复用，
+    并发请求在同一 TLS 连接上多路复用，避免重复握手。
+    按进程创建：队列使用 multiprocessing 派生子进程，子进程不能复用父进程已建立的连接。
+    """
+    global _client, _client_pid
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=40, max_connections=100, keepalive_expiry=30),
+                timeout=httpx.Timeout(300.0, connect=10.0),
+            )
+            _client_pid = os.getpid()
+        return _client
@@ -0,0 +1,75 @@
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from biz.llm.embeddings import EmbeddingProvider
+
+
+class _FakeEmbeddings:
+    """记录每次请求的 input，按文本长度返回可区分的向量"""
+
+    def __init__(self):
+        self.calls = []
+
+    def create(self, model, input):
+        self.calls.append(list(input))
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(t)), 1.0]) for t in input])
+
+
+class TestEmbeddingProvider(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {
+            "OPENAI_API_KEY": "test",
+            "EMBEDDING_CACHE_DIR": self.tmpdir.name,
+            "EMBEDDING_BATCH_SIZE": "2",
+        })
+        self.env.start()
+        self.openai = patch("biz.llm.embeddings.OpenAI")
+        openai_cls = self.openai.start()
+        self.fake = _FakeEmbeddings()
+        openai_cls.return_value.embeddings = self.fake
+
+    def tearDown(self):
+        self.openai.stop()
+        self.env.stop()
+        self.tmpdir.cleanup()
+
+    def test_batches_and_keeps_order(self):
+        provider = EmbeddingProvider()
+        result = provider.get_embeddings(["a", "bb", "ccc", "dddd", "eeeee"])
+        self.assertEqual(self.fake.calls, [["a", "bb"], ["ccc", "dddd"], ["eeeee"]])
+        self.assertEqual([r[0] for r in result], [1.0, 2.0, 3.0, 4.0, 5.0])
+
+    def test_misses_deduplicated(self):
+        provider = EmbeddingProvider()
+        result = provider.get_embeddings(["x", "yy", "x", "yy", "x"])
+        self.assertEqual(self.fake.calls, [["x", "yy"]])
+        self.assertEqual([r[0] for r in result], [1.0, 2.0, 1.0, 2.0, 1.0])
+
+    def test_cache_hits_merged_with_misses(self):
+        EmbeddingProvider().get_embeddings(["bb", "dddd"])
+        self.fake.calls.clear()
+        result = EmbeddingProvider().get_embeddings(["a", "bb", "ccc", "dddd"])
+        self.assertEqual(self.fake.calls, [["a", "ccc"]])
+        self.assertEqual([r[0] for r in result], [1.0, 2.0, 3.0, 4.0])
+
+    def test_cache_keyed_by_model(self):
+        EmbeddingProvider(model="m1").get_embeddings(["a"])
+        EmbeddingProvider(model="m2").get_embeddings(["a"])
+        self.assertEqual(self.fake.calls, [["a"], ["a"]])
+
+    def test_empty_input(self):
+        self.assertEqual(EmbeddingProvider().get_embeddings([]), [])
+        self.assertEqual(self.fake.calls, [])
+
+    def test_missing_api_key(self):
+        with patch.dict(os.environ, {"OPENAI_API_KEY": ""}):
+            with self.assertRaises(ValueError):
+                EmbeddingProvider()
+
+
+if __name__ == '__main__':
+    main()
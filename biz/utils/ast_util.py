@@ -2,26 +2,79 @@ import ast
 import re
 from typing import List, Set
 
+# 依赖抽取正则合并为一个交替模式，在模块加载时编译一次，对代码只扫描一遍
+_DEP_PATTERN = re.compile("|".join((
+    r"import\s+[\w\{\}\*,\s]+\s+from\s+['\"](?P<es_from>[^'\"\s]+)['\"]",   # ES import from
+    r"import\s+['\"](?P<es_bare>[^'\"\s]+)['\"]",                          # ES bare import / Go import "pkg"
+    r"require\(\s*['\"](?P<require>[^'\"\s]+)['\"]\s*\)",                  # CommonJS require
+    r"import\s+(?P<java>[a-zA-Z0-9_\.]+);",                             # Java import
+    r"#include\s*[<\"](?P<include>[^>\"]+)[>\"]",                          # C/C++ include
+    r"use\s+(?P<php>[A-Za-z0-9_\\]+);",                                # PHP use
+)))
+
+# Python 风格的 import：from 分支用前瞻不消耗 "import"，保证 from x import y 中的 import y 仍能被匹配
+_PY_LIKE_PATTERN = re.compile("|".join((
+    r"from\s+(?P<py_from>[a-zA-Z0-9_\.]+)(?=\s+import\s)",
+    r"import\s+(?P<py_import>[a-zA-Z0-9_\.]+)",
+)))
+
+# 只收录在 Python 中不可能成立的行首写法，命中则跳过 AST 解析：
+# C/C++ #include <x> / "x"、PHP 开始标记、Java/Go 的 package 声明、Go func 定义、JS function 定义、ES import ... from '...'
+_NON_PYTHON_HINT = re.compile(
+    r"^[ \t]*(?:#include\s*[<\"]"
+    r"|<\?php\b"
+    r"|package\s+[\w.]+[ \t]*;?[ \t]*$"
+    r"|func\s+(?:\([^)]*\)\s*)?\w+\s*\(.*\{"
+    r"|function\s+\w+\s*\("
+    r"|import\s.*\sfrom\s+['\"])",
+    re.MULTILINE,
+)
+
+
+def _looks_python(code: str) -> bool:
+    """
+    只检查开头 4KB 的廉价判断，避免对 JS/Go/Java/C++ 等代码做一次完整的 ast.parse。
+    误判为非 Python 会让正则回退把导入的符号名当作依赖，因此特征只取 Python 中不可能出现的写法。
+    """
+    return _NON_PYTHON_HINT.search(code[:4096]) is None
+
+
+class _ImportCollector(ast.NodeVisitor):
+    """
+    只沿语句列表（body/orelse/finalbody/handlers/cases）下降收集 import，
+    import 只能出现在语句位置，因此跳过所有表达式子树不会漏掉依赖。
+    """
+    _BODY_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+    def __init__(self):
+        self.deps: Set[str] = set()
+
+    def visit_Import(self, node: ast.Import):
+        self.deps.update(alias.name.partition('.')[0] for alias in node.names if alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module:
+            self.deps.add(node.module.partition('.')[0])
+
+    def generic_visit(self, node: ast.AST):
+        for field in self._BODY_FIELDS:
+            children = getattr(node, field, None)
+            if isinstance(children, list):
+                for child in children:
+                    self.visit(child)
+
 
 def _extract_python_imports(code: str) -> List[str]:
     """
     使用 Python AST 抽取 import/from import 的依赖名。
     """
-    deps: Set[str] = set()
+    collector = _ImportCollector()
     try:
-        tree = ast.parse(code)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    if alias.name:
-                        deps.add(alias.name.split('.')[0])
-            elif isinstance(node, ast.ImportFrom):
-                if node.module:
-                    deps.add(node.module.split('.')[0])
+        collector.visit(ast.parse(code))
     except Exception:
         # 语法错误等，交给通用解析
         pass
-    return list(deps)
+    return list(collector.deps)
 
 
 def _extract_generic_deps_by_regex(code: str) -> List[str]:
@@ -35,33 +88,17 @@ def _extract_generic_deps_by_regex(code: str) -> List[str]:
     """
     deps: Set[str] = set()
 
-    patterns = [
-        r"import\s+[\w\{\}\*,\s]+\s+from\s+['\"]([^'\"\s]+)['\"]",   # ES import from
-        r"import\s+['\"]([^'\"\s]+)['\"]",                          # ES bare import
-        r"require\(\s*['\"]([^'\"\s]+)['\"]\s*\)",                  # CommonJS require
-        r"import\s+([a-zA-Z0-9_\.]+);",                             # Java import
-        r"#include\s*[<\"]([^>\"]+)[>\"]",                          # C/C++ include
-        r"use\s+([A-Za-z0-9_\\]+);",                                # PHP use
-        r"import\s+\"([^\"\s]+)\"",                                 # Go import "pkg"
-    ]
-
-    for p in patterns:
-        for m in re.findall(p, code):
-            # 取第一段作为主包名
-            pkg = str(m).split('/')[0].split('.')[0]
-            if pkg:
-                deps.add(pkg)
+    for m in _DEP_PATTERN.finditer(code):
+        # 取第一段作为主包名
+        pkg = m.group(m.lastgroup).partition('/')[0].partition('.')[0]
+        if pkg:
+            deps.add(pkg)
 
     # 兜底：也尝试抓 Python 的 import/from import
-    py_like = [
-        r"from\s+([a-zA-Z0-9_\.]+)\s+import\s+",
-        r"import\s+([a-zA-Z0-9_\.]+)",
-    ]
-    for p in py_like:
-        for m in re.findall(p, code):
-            pkg = str(m).split('.')[0]
-            if pkg:
-                deps.add(pkg)
+    for m in _PY_LIKE_PATTERN.finditer(code):
+        pkg = m.group(m.lastgroup).partition('.')[0]
+        if pkg:
+            deps.add(pkg)
 
     return list(deps)
 
@@ -70,7 +107,8 @@ def extract_dependencies_from_code(code: str) -> List[str]:
     """
     高优先级用 Python AST（能解析就拿），否则使用通用正则回退。
     """
-    deps = _extract_python_imports(code)
-    if deps:
-        return deps
+    if _looks_python(code):
+        deps = _extract_python_imports(code)
+        if deps:
+            return deps
     return _extract_generic_deps_by_regex(code)
\ No newline at end of file
@@ -1,14 +1,40 @@
 import abc
 import os
 import re
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 
 import yaml
 from jinja2 import Template
 
 from biz.llm.factory import Factory
 from biz.utils.log import logger
-from biz.utils.token_util import count_tokens, truncate_text_by_tokens
+from biz.utils.token_util import encode_tokens, truncate_text_by_tokens
+
+
+PROMPT_TEMPLATES_FILE = "conf/prompt_templates.yml"
+
+# 依赖上下文块之间的分隔符及其 token 数（cl100k_base 下 "\n\n" 为单个 token）
+_DEP_CONTEXT_SEPARATOR = "\n\n"
+_DEP_CONTEXT_SEPARATOR_TOKENS = 1
+
+# 优先使用 libyaml 的 C 实现，未编译 libyaml 时回退到纯 Python 的 SafeLoader
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@lru_cache(maxsize=16)
+def _load_prompts_cached(prompt_key: str, style: str, mtime: float) -> Tuple[str, str]:
+    """
+    解析并渲染提示词模板，按 (prompt_key, style, 文件 mtime) 缓存，模板文件修改后自动重新加载。
+    """
+    # 在打开 YAML 文件时显式指定编码为 UTF-8，避免使用系统默认的 GBK 编码。
+    with open(PROMPT_TEMPLATES_FILE, "r", encoding="utf-8") as file:
+        prompts = yaml.load(file, Loader=_YamlLoader).get(prompt_key, {})
+
+    # 使用Jinja2渲染模板
+    system_prompt = Template(prompts["system_prompt"]).render(style=style)
+    user_prompt = Template(prompts["user_prompt"]).render(style=style)
+    return system_prompt, user_prompt
 
 
 class BaseReviewer(abc.ABC):
@@ -20,23 +46,14 @@ class BaseReviewer(abc.ABC):
 
     def _load_prompts(self, prompt_key: str, style="professional") -> Dict[str, Any]:
         """加载提示词配置"""
-        prompt_templates_file = "conf/prompt_templates.yml"
         try:
-            # 在打开 YAML 文件时显式指定编码为 UTF-8，避免使用系统默认的 GBK 编码。
-            with open(prompt_templates_file, "r", encoding="utf-8") as file:
-                prompts = yaml.safe_load(file).get(prompt_key, {})
-
-                # 使用Jinja2渲染模板
-                def render_template(template_str: str) -> str:
-                    return Template(template_str).render(style=style)
-
-                system_prompt = render_template(prompts["system_prompt"])
-                user_prompt = render_template(prompts["user_prompt"])
-
-                return {
-                    "system_message": {"role": "system", "content": system_prompt},
-                    "user_message": {"role": "user", "content": user_prompt},
-                }
+            system_prompt, user_prompt = _load_prompts_cached(
+                prompt_key, style, os.path.getmtime(PROMPT_TEMPLATES_FILE)
+            )
+            return {
+                "system_message": {"role": "system", "content": system_prompt},
+                "user_message": {"role": "user", "content": user_prompt},
+            }
         except (FileNotFoundError, KeyError, yaml.YAMLError) as e:
             logger.error(f"加载提示词配置失败: {e}")
             raise Exception(f"提示词配置加载失败: {e}")
@@ -75,10 +92,8 @@ class CodeReviewer(BaseReviewer):
             logger.info("代码为空, diffs_text = %", str(changes_text))
             return "代码为空"
 
-        # 计算tokens数量，如果超过REVIEW_MAX_TOKENS，截断changes_text
-        tokens_count = count_tokens(changes_text)
-        if tokens_count > review_max_tokens:
-            changes_text = truncate_text_by_tokens(changes_text, review_max_tokens)
+        # 如果tokens数量超过REVIEW_MAX_TOKENS，截断changes_text（只做一次编码）
+        changes_text = truncate_text_by_tokens(changes_text, review_max_tokens)
 
         review_result = self.review_code(changes_text, commits_text).strip()
         if review_result.startswith("```markdown") and review_result.endswith("```"):
@@ -98,27 +113,34 @@ class CodeReviewer(BaseReviewer):
         dep_display = ", ".join(dependencies[:20]) + (" ..." if len(dependencies) > 20 else "")
 
         # 3) 基于依赖做向量检索（带降级策略）
-        related_context_blocks = []
+        hits = []
         try:
-            from biz.utils.vector_store import VectorStore
+            from biz.utils.vector_store import get_default_store
             top_k = int(os.getenv("DEP_TOP_K", 5))
-            store = VectorStore()  # 默认 data/vector_store.json
+            store = get_default_store()  # 默认 data/vector_store.json
             hits = store.search_similar(dependencies, top_k=top_k)
-
-            for i, item in enumerate(hits, start=1):
-                # item: {"id","name","text","score"}
-                related_context_blocks.append(
-                    f"[{i}] {item.get('name','')}\nscore={item.get('score',0):.4f}\n{item.get('text','')}"
-                )
         except Exception as e:
             logger.warning(f"依赖向量检索失败或跳过: {e}")
 
-        # 4) 组装“依赖上下文”并做 token 限制
-        related_context = "\n\n".join(related_context_blocks).strip()
+        # 4) 组装“依赖上下文”，逐块累计 token，超出预算的块截断到剩余额度后停止
         dep_context_max_tokens = int(os.getenv("DEP_CONTEXT_MAX_TOKENS", 1024))
-        if related_context:
-            if count_tokens(related_context) > dep_context_max_tokens:
-                related_context = truncate_text_by_tokens(related_context, dep_context_max_tokens)
+        related_context_blocks = []
+        used_tokens = 0
+        for i, item in enumerate(hits, start=1):
+            # item: {"id","name","text","score"}
+            block = f"[{i}] {item.get('name','')}\nscore={item.get('score',0):.4f}\n{item.get('text','')}"
+            tokens = encode_tokens(block)
+            block_tokens = len(tokens)
+            if related_context_blocks:
+                used_tokens += _DEP_CONTEXT_SEPARATOR_TOKENS
+            remaining = dep_context_max_tokens - used_tokens
+            if block_tokens > remaining:
+                if remaining > 0:
+                    related_context_blocks.append(truncate_text_by_tokens(block, remaining, tokens=tokens))
+                break
+            related_context_blocks.append(block)
+            used_tokens += block_tokens
+        related_context = _DEP_CONTEXT_SEPARATOR.join(related_context_blocks).strip()
 
         # 5) 拼接进原有 prompt（保持原有格式不变，仅追加上下文提示段）
         base_user_content = self.prompts["user_message"]["content"].format(
@@ -0,0 +1,74 @@
+from unittest import TestCase, main
+
+from biz.utils.ast_util import _looks_python, extract_dependencies_from_code
+
+
+class TestExtractDependencies(TestCase):
+    def test_python_imports(self):
+        code = "import os.path\nimport numpy as np\nfrom requests.adapters import HTTPAdapter\n"
+        self.assertEqual(sorted(extract_dependencies_from_code(code)), ["numpy", "os", "requests"])
+
+    def test_python_nested_imports(self):
+        code = (
+            "def handler():\n"
+            "    try:\n"
+            "        import yaml\n"
+            "    except ImportError:\n"
+            "        from json import loads\n"
+            "    return [x for x in range(3)]\n"
+        )
+        self.assertEqual(sorted(extract_dependencies_from_code(code)), ["json", "yaml"])
+
+    def test_javascript(self):
+        code = (
+            "import React from 'react';\n"
+            "import './styles.css';\n"
+            "const _ = require('lodash/fp');\n"
+        )
+        deps = extract_dependencies_from_code(code)
+        self.assertIn("react", deps)
+        self.assertIn("lodash", deps)
+
+    def test_java(self):
+        code = "package demo;\nimport com.google.common.Lists;\n"
+        self.assertIn("com", extract_dependencies_from_code(code))
+
+    def test_cpp(self):
+        code = "#include <vector>\n#include \"util/str.h\"\nint main() { return 0; }\n"
+        deps = extract_dependencies_from_code(code)
+        self.assertIn("vector", deps)
+        self.assertIn("util", deps)
+
+    def test_go(self):
+        code = 'package main\n\nimport "github.com/gin-gonic/gin"\n'
+        self.assertIn("github", extract_dependencies_from_code(code))
+
+    def test_looks_python(self):
+        self.assertTrue(_looks_python("import os\nconfig = {\n    'a': 1,\n}\n"))
+        self.assertFalse(_looks_python("package main\n\nimport \"fmt\"\n"))
+        self.assertFalse(_looks_python("import React from 'react';\n"))
+        self.assertFalse(_looks_python("#include <vector>\n"))
+        self.assertFalse(_looks_python("<?php\nuse Foo\\Bar;\n"))
+        self.assertFalse(_looks_python("func (s *Server) Run(addr string) error {\n"))
+        self.assertFalse(_looks_python("function render(props) {\n"))
+
+    def test_python_resembling_other_languages(self):
+        code = (
+            "from biz.cmd.func import BranchReviewFunc\n"
+            "from pydantic import BaseModel\n"
+            "\n"
+            "class Call(BaseModel):\n"
+            "    function: Function\n"
+            "\n"
+            "func = BranchReviewFunc()\n"
+            "require(func);\n"
+        )
+        self.assertTrue(_looks_python(code))
+        self.assertEqual(sorted(extract_dependencies_from_code(code)), ["biz", "pydantic"])
+
+    def test_empty(self):
+        self.assertEqual(extract_dependencies_from_code(""), [])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import os
+from unittest import TestCase, main
+from unittest.mock import MagicMock, patch
+
+from biz.utils.code_reviewer import CodeReviewer
+
+
+class _CharEncoding:
+    """按字符计 token 的编码器，替代需要下载词表的 tiktoken"""
+
+    def encode(self, text):
+        return [ord(c) for c in text]
+
+    def decode(self, tokens):
+        return "".join(chr(t) for t in tokens)
+
+
+class TestReviewCodeDependencyContext(TestCase):
+    DIFF = "@@ -0,0 +1,2 @@\n+import numpy\n+import requests\n"
+
+    def setUp(self):
+        patcher = patch("biz.utils.code_reviewer.Factory")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.get_encoding = MagicMock(return_value=_CharEncoding())
+        patcher = patch("biz.utils.token_util.tiktoken.get_encoding", self.get_encoding)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.reviewer = CodeReviewer()
+        self.reviewer.call_llm = lambda messages: messages[-1]["content"]
+
+    def _review(self, hits, max_tokens):
+        store = MagicMock()
+        store.search_similar.return_value = hits
+        env = {"DEP_CONTEXT_MAX_TOKENS": str(max_tokens)}
+        with patch("biz.utils.vector_store.get_default_store", return_value=store), patch.dict(os.environ, env):
+            return self.reviewer.review_code(self.DIFF)
+
+    @staticmethod
+    def _block(i, name, text):
+        return f"[{i}] {name}\nscore=0.9000\n{text}"
+
+    def _hits(self):
+        return [
+            {"id": "pkg:numpy", "name": "numpy", "text": "a" * 20, "score": 0.9},
+            {"id": "pkg:requests", "name": "requests", "text": "b" * 20, "score": 0.9},
+        ]
+
+    def test_all_blocks_fit(self):
+        first, second = self._block(1, "numpy", "a" * 20), self._block(2, "requests", "b" * 20)
+        content = self._review(self._hits(), len(first) + 1 + len(second))
+        self.assertIn(f"{first}\n\n{second}\n", content)
+
+    def test_overflowing_block_truncated_to_remaining_budget(self):
+        first, second = self._block(1, "numpy", "a" * 20), self._block(2, "requests", "b" * 20)
+        # 第一块 + 分隔符后只剩 10 个 token
+        content = self._review(self._hits(), len(first) + 1 + 10)
+        self.assertIn(f"{first}\n\n{second[:10]}\n", content)
+        self.assertNotIn(second[:11], content)
+
+    def test_first_block_truncated(self):
+        content = self._review(self._hits(), 8)
+        self.assertIn("\n\n[1] nump\n", content)
+        self.assertNotIn("[1] numpy", content)
+
+    def test_no_budget_left_after_separator(self):
+        first = self._block(1, "numpy", "a" * 20)
+        content = self._review(self._hits(), len(first))
+        self.assertIn(f"{first}\n", content)
+        self.assertNotIn("[2]", content)
+
+    def test_no_hits(self):
+        content = self._review([], 1024)
+        self.assertNotIn("相关依赖上下文", content)
+        self.get_encoding.assert_not_called()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from biz.utils import vector_store
+from biz.utils.vector_store import VectorStore
+
+
+class TestVectorStore(TestCase):
+    def setUp(self):
+        """写入一个小型向量库"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "vector_store.json")
+        data = {
+            "model": "test",
+            "dimension": 3,
+            "items": [
+                {"id": "pkg:numpy", "name": "numpy", "text": "numpy doc", "embedding": [1.0, 0.0, 0.0]},
+                {"id": "pkg:requests", "name": "requests", "text": "requests doc", "embedding": [0.0, 1.0, 0.0]},
+                {"id": "pkg:pandas", "name": "pandas", "text": "pandas doc", "embedding": [0.6, 0.8, 0.0]},
+                {"id": "pkg:empty", "name": "empty", "text": "no embedding"},
+            ],
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_search_similar_orders_by_cosine(self):
+        store = VectorStore(self.path)
+        with patch.object(VectorStore, "_embed_terms", return_value=[1.0, 0.0, 0.0]):
+            hits = store.search_similar(["numpy"], top_k=2)
+        self.assertEqual([h["name"] for h in hits], ["numpy", "pandas"])
+        self.assertAlmostEqual(hits[0]["score"], 1.0, places=5)
+        self.assertAlmostEqual(hits[1]["score"], 0.6, places=5)
+
+    def test_search_similar_top_k_larger_than_store(self):
+        store = VectorStore(self.path)
+        with patch.object(VectorStore, "_embed_terms", return_value=[0.0, 1.0, 0.0]):
+            hits = store.search_similar(["requests"], top_k=10)
+        self.assertEqual([h["name"] for h in hits], ["requests", "pandas", "numpy"])
+
+    def test_search_similar_falls_back_to_keyword(self):
+        store = VectorStore(self.path)
+        with patch.object(VectorStore, "_embed_terms", return_value=None):
+            hits = store.search_similar(["Pandas"], top_k=5)
+        self.assertEqual([h["name"] for h in hits], ["pandas"])
+        self.assertEqual(hits[0]["score"], 1.0)
+
+    def test_index_types_agree(self):
+        for index_type in ("hnsw", "flat", "numpy"):
+            with patch.dict(os.environ, {"VECTOR_INDEX_TYPE": index_type}):
+                store = VectorStore(self.path)
+            with patch.object(VectorStore, "_embed_terms", return_value=[0.6, 0.8, 0.0]):
+                hits = store.search_similar(["pandas"], top_k=3)
+            self.assertEqual([h["name"] for h in hits], ["pandas", "requests", "numpy"], index_type)
+
+    def test_quantized_search(self):
+        for index_type in ("hnsw", "flat", "numpy"):
+            for quantization in ("fp16", "int8"):
+                env = {"VECTOR_INDEX_TYPE": index_type, "VECTOR_QUANTIZATION": quantization}
+                with patch.dict(os.environ, env):
+                    store = VectorStore(self.path)
+                with patch.object(VectorStore, "_embed_terms", return_value=[0.6, 0.8, 0.0]):
+                    hits = store.search_similar(["pandas"], top_k=3)
+                self.assertEqual([h["name"] for h in hits], ["pandas", "requests", "numpy"], env)
+                self.assertAlmostEqual(hits[0]["score"], 1.0, delta=0.02)
+
+    def test_numba_imported_only_for_int8(self):
+        code = (
+            "import sys\n"
+            "from biz.utils.vector_store import VectorStore\n"
+            f"VectorStore({self.path!r})\n"
+            "print('numba' in sys.modules)\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip().splitlines()[-1], "False")
+
+    def test_faiss_index_cache_reused(self):
+        with patch.dict(os.environ, {"VECTOR_INDEX_TYPE": "flat"}):
+            VectorStore(self.path)
+            self.assertTrue(os.path.exists(f"{self.path}.flat.faiss"))
+            store = VectorStore(self.path)
+        self.assertEqual(store._index.ntotal, 3)
+
+    def test_sidecar_reused(self):
+        VectorStore(self.path)
+        self.assertEqual(len(glob.glob(f"{glob.escape(self.path)}.*.npy")), 1)
+        store = VectorStore(self.path)
+        self.assertEqual(store.names, ["numpy", "requests", "pandas", "empty"])
+        self.assertEqual(store.rows, [0, 1, 2])
+        self.assertEqual(store.M.shape, (3, 3))
+        with patch.object(VectorStore, "_embed_terms", return_value=[1.0, 0.0, 0.0]):
+            hits = store.search_similar(["numpy"], top_k=1)
+        self.assertEqual(hits[0]["id"], "pkg:numpy")
+
+    def test_sidecar_rejected_when_source_differs(self):
+        VectorStore(self.path)
+        self.assertEqual([n for n in os.listdir(self.tmpdir.name) if n.endswith(".tmp")], [])
+        # 改写 JSON 但保留原修改时间，仅凭 mtime 无法察觉
+        st = os.stat(self.path)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"items": [{"id": "pkg:flask", "name": "flask", "text": "flask doc", "embedding": [0.0, 0.0, 1.0]}]}, f)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        store = VectorStore(self.path)
+        self.assertEqual(store.names, ["flask"])
+        self.assertEqual(store.M.shape, (1, 3))
+        self.assertEqual(len(glob.glob(f"{glob.escape(self.path)}.*.npy")), 1)
+
+    def test_sidecar_rejected_when_same_size_rewrite(self):
+        VectorStore(self.path)
+        # 交换两条 embedding，文件大小与修改时间都不变，只有内容摘要能察觉
+        st = os.stat(self.path)
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        raw = raw.replace(b"[1.0, 0.0, 0.0]", b"[x]").replace(b"[0.0, 1.0, 0.0]", b"[1.0, 0.0, 0.0]").replace(b"[x]", b"[0.0, 1.0, 0.0]")
+        with open(self.path, "wb") as f:
+            f.write(raw)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(os.path.getsize(self.path), st.st_size)
+        store = VectorStore(self.path)
+        with patch.object(VectorStore, "_embed_terms", return_value=[1.0, 0.0, 0.0]):
+            hits = store.search_similar(["requests"], top_k=1)
+        self.assertEqual(hits[0]["name"], "requests")
+
+    def test_faiss_index_rebuilt_when_source_older(self):
+        with patch.dict(os.environ, {"VECTOR_INDEX_TYPE": "hnsw"}):
+            VectorStore(self.path)
+            # 重新生成 embedding 后以更早的 mtime 部署（cp -p / rsync -t），条目数不变
+            st = os.stat(self.path)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"items": [
+                    {"id": "pkg:numpy", "name": "numpy", "text": "numpy doc", "embedding": [0.0, 1.0, 0.0]},
+                    {"id": "pkg:requests", "name": "requests", "text": "requests doc", "embedding": [1.0, 0.0, 0.0]},
+                    {"id": "pkg:pandas", "name": "pandas", "text": "pandas doc", "embedding": [0.6, 0.8, 0.0]},
+                ]}, f)
+            os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns - 10 ** 10))
+            store = VectorStore(self.path)
+        with patch.object(VectorStore, "_embed_terms", return_value=[1.0, 0.0, 0.0]):
+            hits = store.search_similar(["requests"], top_k=1)
+        self.assertEqual(hits[0]["name"], "requests")
+
+    def test_reload_if_changed(self):
+        store = VectorStore(self.path)
+        self.assertFalse(store.reload_if_changed())
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"items": [{"id": "pkg:flask", "name": "flask", "text": "flask doc", "embedding": [0.0, 0.0, 1.0]}]}, f)
+        os.utime(self.path, (os.path.getatime(self.path), os.path.getmtime(self.path) + 10))
+        self.assertTrue(store.reload_if_changed())
+        self.assertEqual(store.names, ["flask"])
+        self.assertEqual(store.M.shape, (1, 3))
+
+    def test_query_vector_cached(self):
+        vector_store._query_vector.cache_clear()
+        store = VectorStore(self.path)
+        with patch("biz.llm.embeddings.EmbeddingProvider") as provider_cls:
+            provider_cls.return_value.get_embeddings.return_value = [[3.0, 0.0, 0.0], [0.0, 4.0, 0.0]]
+            first = store.search_similar(["numpy", "requests"], top_k=1)
+            second = VectorStore(self.path).search_similar(["Requests", "numpy", "numpy"], top_k=1)
+        provider_cls.return_value.get_embeddings.assert_called_once_with(["numpy", "requests"])
+        self.assertEqual(first, second)
+        self.assertEqual(first[0]["name"], "pandas")
+
+    def test_query_vector_failure_not_cached(self):
+        vector_store._query_vector.cache_clear()
+        store = VectorStore(self.path)
+        with patch("biz.llm.embeddings.EmbeddingProvider") as provider_cls:
+            provider_cls.return_value.get_embeddings.side_effect = [RuntimeError("timeout"), [[1.0, 0.0, 0.0]]]
+            fallback = store.search_similar(["numpy"], top_k=1)
+            retried = store.search_similar(["numpy"], top_k=1)
+        self.assertEqual(fallback[0]["score"], 1.0)
+        self.assertEqual(retried[0]["name"], "numpy")
+        self.assertEqual(provider_cls.return_value.get_embeddings.call_count, 2)
+
+    def test_missing_store(self):
+        store = VectorStore(os.path.join(self.tmpdir.name, "missing.json"))
+        self.assertEqual(store.search_similar(["numpy"]), [])
+
+
+if __name__ == '__main__':
+    main()
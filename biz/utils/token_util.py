@@ -1,6 +1,22 @@
+from typing import List, Optional
+
 import tiktoken
 
 
+def encode_tokens(text: str, encoding_name: str = "cl100k_base") -> List[int]:
+    """
+    将文本编码为 token 列表；需要先计数再截断时可把结果传给 truncate_text_by_tokens，避免重复编码。
+
+    Args:
+        text (str): 输入文本。
+        encoding_name (str): 使用的编码器名称，默认为 "cl100k_base"。
+
+    Returns:
+        List[int]: token 列表。
+    """
+    return tiktoken.get_encoding(encoding_name).encode(text)
+
+
 def count_tokens(text: str) -> int:
     """
     计算文本的 token 数量。
@@ -11,11 +27,11 @@ def count_tokens(text: str) -> int:
     Returns:
         int: token 数量。
     """
-    encoding = tiktoken.get_encoding("cl100k_base")  # 适用于 OpenAI GPT 系列
-    return len(encoding.encode(text))
+    return len(encode_tokens(text, "cl100k_base"))  # 适用于 OpenAI GPT 系列
 
 
-def truncate_text_by_tokens(text: str, max_tokens: int, encoding_name: str = "cl100k_base") -> str:
+def truncate_text_by_tokens(text: str, max_tokens: int, encoding_name: str = "cl100k_base",
+                            tokens: Optional[List[int]] = None) -> str:
     """
     根据最大 token 数量截断文本。
 
@@ -23,20 +39,19 @@ def truncate_text_by_tokens(text: str, max_tokens: int, encoding_name: str = "cl
         text (str): 需要截断的原始文本。
         max_tokens (int): 最大 token 数量。
         encoding_name (str): 使用的编码器名称，默认为 "cl100k_base"。
+        tokens (List[int], optional): 已由 encode_tokens 得到的 token 列表，传入时不再重复编码。
 
     Returns:
         str: 截断后的文本。
     """
-    # 获取编码器
-    encoding = tiktoken.get_encoding(encoding_name)
-
     # 将文本编码为 tokens
-    tokens = encoding.encode(text)
+    if tokens is None:
+        tokens = encode_tokens(text, encoding_name)
 
     # 如果 tokens 数量超过最大限制，则截断
     if len(tokens) > max_tokens:
         truncated_tokens = tokens[:max_tokens]
-        truncated_text = encoding.decode(truncated_tokens)
+        truncated_text = tiktoken.get_encoding(encoding_name).decode(truncated_tokens)
         return truncated_text
 
     return text
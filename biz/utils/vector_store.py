@@ -1,20 +1,116 @@
-import json
-import math
+import glob
+import hashlib
 import os
-from typing import List, Dict, Any, Optional
+import tempfile
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+import numpy as np
+import orjson
 
 from biz.utils.log import logger
 
+# 量化矩阵分块反量化打分时每块的行数，使临时 float32 块驻留在缓存中
+_SCORE_BLOCK_ROWS = 256
+
+
+@lru_cache(maxsize=None)
+def _int8_kernel() -> Optional[Callable]:
+    """
+    按需导入 numba 并编译 int8 打分内核，进程内只做一次；未安装 numba 时返回 None，使用 NumPy 分块计算。
+    仅 int8 量化且未使用 FAISS 时才会调用，默认配置下导入模块不付出 numba 的导入开销。
+    """
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _score_int8(Q, q, out):
+        """int8 矩阵与 float32 查询向量的内积，按行并行，反量化与乘加融合，不产生临时矩阵"""
+        for i in prange(Q.shape[0]):
+            s = np.float32(0.0)
+            for j in range(Q.shape[1]):
+                s += Q[i, j] * q[j]
+            out[i] = s
+
+    return _score_int8
+
+
+def _atomic_write(path: str, write: Callable[[str], None], mtime_ns: Optional[int] = None):
+    """
+    先写入同目录下唯一命名的临时文件再 os.replace，并发进程各写各的临时文件，读方只会看到完整文件。
+    mtime_ns 非空时把临时文件的修改时间设为该值，用作与源文件对应的版本标记。
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        if mtime_ns is not None:
+            os.utime(tmp, ns=(mtime_ns, mtime_ns))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """返回得分最高的 k 个下标（按得分降序），argpartition 选出候选后仅对 k 个排序：O(N + k log k)"""
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    idx = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+def _normalize(v) -> Optional[np.ndarray]:
+    """转为 float32 并做 L2 归一化（范数由一次 BLAS sdot 得到），零向量返回 None"""
+    v = np.asarray(v, dtype=np.float32)
+    norm = float(np.sqrt(v @ v))
+    if norm == 0:
+        return None
+    return v / norm
 
-def _cosine_sim(a: List[float], b: List[float]) -> float:
-    if not a or not b or len(a) != len(b):
-        return 0.0
-    dot = sum(x * y for x, y in zip(a, b))
-    na = math.sqrt(sum(x * x for x in a))
-    nb = math.sqrt(sum(y * y for y in b))
-    if na == 0 or nb == 0:
-        return 0.0
-    return dot / (na * nb)
+
+def _normalize_rows(M: np.ndarray) -> np.ndarray:
+    """原地对矩阵逐行 L2 归一化，einsum 求行平方和，不产生 N×D 的临时矩阵"""
+    norms = np.sqrt(np.einsum("ij,ij->i", M, M))
+    M /= norms.clip(min=1e-12)[:, None]
+    return M
+
+
+def _mean_query(vecs) -> Optional[np.ndarray]:
+    """多个 term 向量取平均并归一化；结果只读，可安全放入缓存共享"""
+    if not vecs:
+        return None
+    q = _normalize(np.asarray(vecs, dtype=np.float32).mean(axis=0))
+    if q is not None:
+        q.setflags(write=False)
+    return q
+
+
+@lru_cache(maxsize=256)
+def _query_vector(model: str, terms: Tuple[str, ...]) -> np.ndarray:
+    """
+    相同 (Embedding 模型, 排序去重后的依赖元组) 的查询向量进程内缓存，返回归一化后的只读向量。
+    Embedding 不可用或结果为零向量时抛出异常，lru_cache 不缓存异常，下次仍会重试。
+    """
+    from biz.llm.embeddings import EmbeddingProvider
+    provider = EmbeddingProvider(model=model or None)
+    # 对每个 term 做 embedding，取平均作为查询向量
+    q = _mean_query(provider.get_embeddings(list(terms)))
+    if q is None:
+        raise ValueError("查询向量为空或为零向量")
+    return q
+
+
+def _quantize_int8(M: np.ndarray):
+    """按行对称量化为 int8：q = round(v / scale)，scale = max(|v|) / 127"""
+    scales = (np.abs(M).max(axis=1) / 127.0).clip(min=1e-12).astype(np.float32)
+    Q = np.round(M / scales[:, None]).astype(np.int8)
+    return Q, scales
 
 
 class VectorStore:
@@ -31,39 +127,244 @@ class VectorStore:
     """
     def __init__(self, path: Optional[str] = None):
         self.path = path or os.getenv("VECTOR_STORE_PATH", "data/vector_store.json")
-        self.data: Dict[str, Any] = {"items": []}
+        # FAISS 索引类型（hnsw | flat），其他取值使用 NumPy 矩阵乘
+        self.index_type = os.getenv("VECTOR_INDEX_TYPE", "hnsw").lower()
+        # 存储精度（fp32 | fp16 | int8），量化后扫描的数据量减半 / 减为四分之一
+        self.quantization = os.getenv("VECTOR_QUANTIZATION", "fp32").lower()
         self._load()
 
+    def _reset(self):
+        # 条目按列存储（SoA）：ids/names/texts 为全部条目的并行数组；
+        # M 为带 embedding 条目的 N×D float32 矩阵（行已 L2 归一化），rows[i] 为第 i 行对应的条目下标
+        self.ids: List[Any] = []
+        self.names: List[Any] = []
+        self.texts: List[Any] = []
+        self.M = np.zeros((0, 0), dtype=np.float32)
+        self.rows: List[int] = []
+        self._index = None
+        self._Q: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._score_int8: Optional[Callable] = None
+
+    def _stat_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def reload_if_changed(self) -> bool:
+        """
+        向量库文件的 mtime 与加载时不同（新增、修改或删除）则重新加载，返回是否发生了重载。
+        """
+        if self._stat_mtime() == self._mtime:
+            return False
+        logger.info(f"向量库文件已变更，重新加载: {self.path}")
+        self._load()
+        return True
+
     def _load(self):
+        self._reset()
+        self._mtime = self._stat_mtime()
+        sidecar_loaded = False
         try:
             if os.path.exists(self.path):
-                with open(self.path, "r", encoding="utf-8") as f:
-                    self.data = json.load(f)
+                digest = self._source_digest()
+                sidecar_loaded = self._load_sidecar(digest)
+                if not sidecar_loaded:
+                    with open(self.path, "rb") as f:
+                        items = orjson.loads(f.read()).get("items", [])
+                    self._build_columns(items)
+                    self._save_sidecar(digest)
             else:
                 logger.warning(f"向量库文件不存在，将跳过检索: {self.path}")
         except Exception as e:
             logger.warning(f"加载向量库失败: {e}")
-            self.data = {"items": []}
+            self._reset()
+        # 缓存矩阵失效说明 JSON 已变化，同目录的 .faiss 也不可信，必须重建
+        self._build_index(reuse_cache=sidecar_loaded)
+        if self._index is None:
+            self._quantize()
 
-    def _embed_terms(self, terms: List[str]) -> Optional[List[float]]:
+    def _build_columns(self, items: List[Dict[str, Any]]):
         """
-        使用 OpenAI Embedding 对 terms 做平均向量，若不可用则返回 None 表示降级。
+        将条目拆为并行数组，并把 embedding 预先堆叠为归一化矩阵，检索时一次矩阵乘即可得到全部余弦相似度。
+        维度与首个有效 embedding 不一致的条目不参与向量检索。
         """
+        self.ids = [it.get("id") for it in items]
+        self.names = [it.get("name") for it in items]
+        self.texts = [it.get("text") for it in items]
+        vecs, rows = [], []
+        dim = None
+        for i, it in enumerate(items):
+            emb = it.get("embedding")
+            if not isinstance(emb, list) or not emb:
+                continue
+            if dim is None:
+                dim = len(emb)
+            elif len(emb) != dim:
+                continue
+            vecs.append(emb)
+            rows.append(i)
+        self.rows = rows
+        if not vecs:
+            return
+        self.M = _normalize_rows(np.asarray(vecs, dtype=np.float32))
+
+    def _source_digest(self) -> str:
+        """JSON 原始字节的摘要，只做哈希不做解析，远比解析全部浮点数便宜"""
+        h = hashlib.blake2b(digest_size=16)
+        with open(self.path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _sidecar_paths(self, digest: str) -> Tuple[str, str]:
+        return f"{self.path}.{digest}.npy", f"{self.path}.meta.json"
+
+    def _load_sidecar(self, digest: str) -> bool:
+        """
+        读取 JSON 同目录下的 .npy 矩阵（内存映射）与精简元数据 .meta.json，跳过对全部浮点数的解析。
+        .npy 文件名带有生成时 JSON 内容的摘要，.meta.json 的 source 字段记录同一摘要，
+        二者都与当前 JSON 一致时才使用，JSON 内容有任何变化（即使大小与 mtime 不变）都会重建。
+        """
+        npy_path, meta_path = self._sidecar_paths(digest)
         try:
-            from biz.llm.embeddings import EmbeddingProvider
-            provider = EmbeddingProvider()
-            # 对每个 term 做 embedding，取平均作为查询向量
-            vecs = provider.get_embeddings(terms)
-            if not vecs:
-                return None
-            dim = len(vecs[0])
-            avg = [0.0] * dim
-            for v in vecs:
-                for i, x in enumerate(v):
-                    avg[i] += x
-            n = float(len(vecs))
-            avg = [x / n for x in avg]
-            return avg
+            if not (os.path.exists(npy_path) and os.path.exists(meta_path)):
+                return False
+            with open(meta_path, "rb") as f:
+                meta = orjson.loads(f.read())
+            if meta.get("source") != digest:
+                return False
+            M = np.load(npy_path, mmap_mode="r")
+            if M.ndim != 2 or M.shape[0] != len(meta["rows"]):
+                return False
+            ids, names, texts, rows = meta["ids"], meta["names"], meta["texts"], meta["rows"]
+        except Exception as e:
+            logger.warning(f"读取向量库缓存失败，重新解析 JSON: {e}")
+            return False
+        self.ids, self.names, self.texts, self.rows = ids, names, texts, rows
+        self.M = M
+        return True
+
+    def _save_sidecar(self, digest: str):
+        npy_path, meta_path = self._sidecar_paths(digest)
+        meta = {"source": digest, "ids": self.ids, "names": self.names, "texts": self.texts, "rows": self.rows}
+
+        def write_npy(tmp):
+            with open(tmp, "wb") as f:
+                np.save(f, self.M)
+
+        def write_meta(tmp):
+            with open(tmp, "wb") as f:
+                f.write(orjson.dumps(meta))
+
+        try:
+            # .npy 按内容寻址，同名文件内容必然相同；先写它再替换 .meta.json，读方不会配对到不匹配的矩阵
+            _atomic_write(npy_path, write_npy)
+            _atomic_write(meta_path, write_meta)
+        except Exception as e:
+            logger.warning(f"写入向量库缓存失败: {e}")
+            return
+        # 清理旧版本 JSON 留下的 .npy（已被内存映射的文件在 POSIX 上删除后仍可读）
+        for stale in glob.glob(f"{glob.escape(self.path)}.*.npy"):
+            if stale != npy_path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+    def _quantize(self):
+        if self.M.shape[0] == 0:
+            return
+        if self.quantization == "int8":
+            self._Q, self._scales = _quantize_int8(self.M)
+            self._score_int8 = _int8_kernel()
+        elif self.quantization == "fp16":
+            self._Q = self.M.astype(np.float16)
+
+    def _score(self, q: np.ndarray) -> np.ndarray:
+        """计算全部条目与归一化查询向量的内积，量化矩阵按块反量化后计算"""
+        if self._Q is None:
+            return self.M @ q
+        n = self._Q.shape[0]
+        scores = np.empty(n, dtype=np.float32)
+        if self._score_int8 is not None:
+            self._score_int8(self._Q, q, scores)
+        else:
+            for start in range(0, n, _SCORE_BLOCK_ROWS):
+                end = start + _SCORE_BLOCK_ROWS
+                scores[start:end] = self._Q[start:end].astype(np.float32) @ q
+        if self._scales is not None:
+            scores *= self._scales
+        return scores
+
+    def _build_index(self, reuse_cache: bool = True):
+        """
+        构建 FAISS 内积索引（行已归一化，内积即余弦相似度）。
+        reuse_cache 为真时优先读取与 JSON 同目录的 .faiss 缓存文件；缓存文件的修改时间被设为生成时 JSON 的 mtime_ns，
+        与当前 JSON 不一致或条目数不一致时重建并回写。
+        未安装 faiss 或 VECTOR_INDEX_TYPE 不是 hnsw/flat 时保持 NumPy 检索。
+        """
+        if self.M.shape[0] == 0 or self.index_type not in ("hnsw", "flat"):
+            return
+        try:
+            import faiss
+        except ImportError:
+            logger.warning("未安装 faiss，向量检索使用 NumPy 暴力计算")
+            return
+
+        qtype = {
+            "int8": faiss.ScalarQuantizer.QT_8bit,
+            "fp16": faiss.ScalarQuantizer.QT_fp16,
+        }.get(self.quantization)
+        suffix = f"{self.index_type}.{self.quantization}" if qtype is not None else self.index_type
+        index_path = f"{self.path}.{suffix}.faiss"
+        n, dim = self.M.shape
+        try:
+            source_mtime_ns = os.stat(self.path).st_mtime_ns
+            if reuse_cache and os.path.exists(index_path) and os.stat(index_path).st_mtime_ns == source_mtime_ns:
+                index = faiss.read_index(index_path)
+                if index.ntotal == n and index.d == dim:
+                    self._index = index
+                    return
+            if self.index_type == "hnsw":
+                if qtype is not None:
+                    index = faiss.IndexHNSWSQ(dim, qtype, 32, faiss.METRIC_INNER_PRODUCT)
+                else:
+                    index = faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+            elif qtype is not None:
+                index = faiss.IndexScalarQuantizer(dim, qtype, faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexFlatIP(dim)
+            if not index.is_trained:
+                index.train(self.M)
+            index.add(self.M)
+            self._index = index
+        except Exception as e:
+            logger.warning(f"构建 FAISS 索引失败，使用 NumPy 检索: {e}")
+            return
+        try:
+            _atomic_write(index_path, lambda tmp: faiss.write_index(index, tmp), mtime_ns=source_mtime_ns)
+        except Exception as e:
+            logger.warning(f"写入 FAISS 索引缓存失败: {e}")
+
+    def _hit(self, j: int, score: float) -> Dict[str, Any]:
+        return {"id": self.ids[j], "name": self.names[j], "text": self.texts[j], "score": float(score)}
+
+    def _search_index(self, q: np.ndarray, k: int) -> List[Dict[str, Any]]:
+        if hasattr(self._index, "hnsw"):
+            self._index.hnsw.efSearch = max(64, k)
+        D, I = self._index.search(q.reshape(1, -1), k)
+        return [self._hit(self.rows[i], d) for d, i in zip(D[0], I[0]) if i >= 0]
+
+    def _embed_terms(self, terms: List[str]) -> Optional[np.ndarray]:
+        """
+        使用 OpenAI Embedding 对 terms 做平均并 L2 归一化，作为查询向量；若不可用则返回 None 表示降级。
+        相同依赖集合的查询向量进程内缓存，命中时不再请求 Embedding。
+        """
+        try:
+            # 排序去重，使相同依赖集合得到一致的请求并命中缓存
+            return _query_vector(os.getenv("EMBEDDING_MODEL", ""), tuple(sorted(set(terms))))
         except Exception as e:
             logger.warning(f"Embedding 失败，降级为关键词匹配: {e}")
             return None
@@ -72,44 +373,62 @@ class VectorStore:
         """
         不使用 embedding 时的简单降级策略：按名称包含计分。
         """
-        scored = []
-        items = self.data.get("items", [])
-        for it in items:
-            name = (it.get("name") or "").lower()
-            score = 0
-            for t in terms:
-                t = (t or "").lower()
-                if t and t in name:
-                    score += 1
-            if score > 0:
-                scored.append({"id": it.get("id"), "name": it.get("name"), "text": it.get("text"), "score": float(score)})
-        scored.sort(key=lambda x: x["score"], reverse=True)
-        return scored[:top_k]
+        terms = [t.lower() for t in terms if t]
+        n = len(self.names)
+        scores = np.fromiter(
+            (sum(1 for t in terms if t in (name or "").lower()) for name in self.names),
+            dtype=np.int64, count=n,
+        )
+        candidates = np.flatnonzero(scores)
+        # 同分按原顺序：以 score * n - 下标 作为唯一排序键
+        keys = scores[candidates] * n - candidates
+        return [self._hit(j, scores[j]) for j in candidates[_top_k(keys, top_k)]]
+
+    @staticmethod
+    def _prepare_terms(terms: List[str]) -> List[str]:
+        """
+        小写、去重（保持首次出现顺序）并限制为前 DEP_MAX_TERMS 个，减少发送给 Embedding 的 token。
+        """
+        max_terms = int(os.getenv("DEP_MAX_TERMS", 32))
+        return list(dict.fromkeys(t.lower() for t in terms if t))[:max_terms]
 
     def search_similar(self, terms: List[str], top_k: int = 5) -> List[Dict[str, Any]]:
-        terms = [t for t in terms if t]
-        if not terms:
-            return []
-        items = self.data.get("items", [])
-        if not items:
+        terms = self._prepare_terms(terms)
+        if not terms or not self.ids:
             return []
 
+        # 查询向量已归一化（见 _embed_terms）
         query_vec = self._embed_terms(terms)
         if query_vec is None:
             # 降级：关键词匹配
             return self._keyword_match(terms, top_k)
 
-        # 正常：基于余弦相似度排序
-        results = []
-        for it in items:
-            emb = it.get("embedding")
-            if isinstance(emb, list) and emb:
-                score = _cosine_sim(query_vec, emb)
-                results.append({
-                    "id": it.get("id"),
-                    "name": it.get("name"),
-                    "text": it.get("text"),
-                    "score": float(score),
-                })
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:top_k]
\ No newline at end of file
+        n = self.M.shape[0]
+        if n == 0 or top_k <= 0:
+            return []
+        q = np.asarray(query_vec, dtype=np.float32)
+        if q.shape != (self.M.shape[1],):
+            logger.warning(f"查询向量维度 {q.shape} 与向量库维度 {self.M.shape[1]} 不一致，降级为关键词匹配")
+            return self._keyword_match(terms, top_k)
+        k = min(top_k, n)
+        if self._index is not None:
+            return self._search_index(q, k)
+
+        # 正常：基于余弦相似度排序（行已归一化，一次矩阵乘得到全部得分，仅对 top_k 排序）
+        scores = self._score(q)
+        return [self._hit(self.rows[i], scores[i]) for i in _top_k(scores, k)]
+
+
+@lru_cache(maxsize=1)
+def _default_store() -> VectorStore:
+    return VectorStore()
+
+
+def get_default_store() -> VectorStore:
+    """
+    进程内共享的默认向量库（VECTOR_STORE_PATH），避免每次 Review 重新读取与解析；
+    文件变更后在下次获取时自动重新加载。
+    """
+    store = _default_store()
+    store.reload_if_changed()
+    return store